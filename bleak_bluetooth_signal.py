@@ -15,10 +15,15 @@ import asyncio
 import argparse
 import time
 import sys
-import math
 import warnings
+import functools
+from bisect import bisect_right
 from bleak import BleakScanner, BleakClient
-from datetime import datetime
+
+# Bleak deprecates BLEDevice.rssi and BLEDevice.metadata, which are only used as
+# fallbacks. Install the filter once at import so the functions stay quiet even
+# when they are used from another module instead of through main()
+warnings.filterwarnings("ignore", message=r"BLEDevice\.\w+ is deprecated", category=FutureWarning)
 
 def estimate_distance(rssi, tx_power=-59, n=2.0):
     """
@@ -32,14 +37,52 @@ def estimate_distance(rssi, tx_power=-59, n=2.0):
     Returns:
         float: Estimated distance in meters
     """
-    if rssi == 0:
-        return -1.0  # Return -1 if RSSI is zero (invalid)
+    return _distance_from_base(_distance_base(n), tx_power, rssi)
+
+def _distance_base(n):
+    """
+    Precompute the base of the path loss model for a path loss exponent.
     
-    # Calculate distance using the path loss model
-    ratio = (tx_power - rssi) / (10 * n)
-    distance = math.pow(10, ratio)
+    The model 10 ** ((tx_power - rssi) / (10 * n)) equals base ** (tx_power - rssi),
+    so monitoring loops compute the base once and reuse it for every reading.
     
-    return round(distance, 2)
+    Args:
+        n (float): The path loss exponent
+        
+    Returns:
+        float: The base to pass to _distance_from_base()
+    """
+    return 10.0 ** (1.0 / (10.0 * n))
+
+def _distance_from_base(base, tx_power, rssi):
+    """
+    Estimate the approximate distance from a precomputed path loss base.
+    
+    Args:
+        base (float): Value returned by _distance_base()
+        tx_power (int): The RSSI value at 1 meter distance (calibration value)
+        rssi (int): The RSSI value in dBm
+        
+    Returns:
+        float: Estimated distance in meters, or -1 if RSSI is zero (invalid)
+    """
+    if rssi == 0:
+        return -1.0
+    
+    return round(base ** (tx_power - rssi), 2)
+
+# Distance bands in meters: label i applies from threshold i-1 (inclusive)
+# up to threshold i (exclusive), negative distances are "Unknown"
+_DISTANCE_THRESHOLDS = (0.0, 0.5, 1.0, 2.0, 5.0, 10.0)
+_DISTANCE_LABELS = (
+    "Unknown",
+    "Very close (< 0.5m)",
+    "Close (< 1m)",
+    "Near (1-2m)",
+    "Medium distance (2-5m)",
+    "Far (5-10m)",
+    "Very far (> 10m)",
+)
 
 def get_distance_description(distance):
     """
@@ -51,20 +94,27 @@ def get_distance_description(distance):
     Returns:
         str: Description of the distance
     """
-    if distance < 0:
-        return "Unknown"
-    elif distance < 0.5:
-        return "Very close (< 0.5m)"
-    elif distance < 1.0:
-        return "Close (< 1m)"
-    elif distance < 2.0:
-        return "Near (1-2m)"
-    elif distance < 5.0:
-        return "Medium distance (2-5m)"
-    elif distance < 10.0:
-        return "Far (5-10m)"
-    else:
-        return "Very far (> 10m)"
+    return _DISTANCE_LABELS[bisect_right(_DISTANCE_THRESHOLDS, distance)]
+
+# Signal strength bar visualizations for 0 to 10 filled blocks, built once
+_BARS = tuple('█' * bars + '░' * (10 - bars) for bars in range(11))
+
+# Map the type byte of Apple manufacturer data to a device type
+# Reference: https://github.com/furiousMAC/continuity/blob/master/dissector/packet-bthci_evt.c
+_APPLE_TYPE_MAP = {
+    0x01: "Apple AirPods",
+    0x02: "Apple Pencil",
+    0x03: "Apple Watch",
+    0x05: "Apple MacBook",
+    0x06: "Apple iPhone",
+    0x07: "Apple iPad",
+    0x09: "Apple HomePod",
+    0x0A: "Apple TV",
+    0x0B: "Apple AirPods Pro",
+    0x0C: "Apple Beats Headphones",
+    0x0F: "Apple AirPods Max",
+    0x10: "Apple AirTag",
+}
 
 def identify_apple_device(mfg_data):
     """
@@ -76,51 +126,120 @@ def identify_apple_device(mfg_data):
     Returns:
         str: Identified Apple device type or "Apple Device" if unknown
     """
-    apple_device_type = "Apple Device"
-    
-    # If we don't have manufacturer data, still return Apple Device
-    if not mfg_data or 76 not in mfg_data:
-        return apple_device_type
+    # Without Apple manufacturer data, or with too few bytes, still identify as Apple
+    data = mfg_data.get(76) if mfg_data else None
+    if not data or len(data) < 2:
+        return "Apple Device"
     
-    # If we have manufacturer data but not enough bytes, still identify as Apple
-    if 76 in mfg_data and len(mfg_data[76]) < 2:
-        return apple_device_type
+    return _APPLE_TYPE_MAP.get(data[0], "Apple Device")
+
+# Names for common non-Apple manufacturers, keyed by Bluetooth SIG company ID
+_MANUFACTURER_NAMES = {
+    6: "Microsoft Device",
+    224: "Google Device",
+    117: "Samsung Device",
+}
+
+# Common 16-bit service UUIDs used as device type hints, in order of priority
+_SERVICE_HINTS = {
+    '1800': "Generic BLE Device",  # Generic Access Profile
+    '180f': "Battery-powered Device",  # Battery Service
+    '180a': "BLE Device",  # Device Information
+    '1812': "HID Device (Keyboard/Mouse)",  # HID Service
+    '1802': "Alert Device",  # Immediate Alert
+    '1803': "Proximity Device",  # Link Loss
+}
+
+# Common Apple MAC address prefixes
+_APPLE_MAC_PREFIXES = (
+    "AC:", "00:C6:", "00:CD:", "88:66:", "98:01:", "7C:9A:",
+    "28:CF:", "54:33:", "C8:2A:", "60:C5:", "68:96:", "24:A0:",
+    "F4:31:", "F0:D1:", "F0:F6:", "F8:1E:", "F8:62:", "FC:E9:",
+    "10:40:", "10:93:", "14:10:", "14:20:", "18:34:", "18:65:",
+    "18:F6:", "1C:36:", "1C:91:", "20:78:", "24:F0:", "28:37:",
+    "28:6A:", "28:E0:", "28:E7:", "34:08:", "34:12:", "34:15:",
+    "34:AB:", "38:0F:", "38:48:", "3C:07:", "3C:D0:", "40:30:",
+    "40:4D:", "40:9C:", "40:A6:", "40:D3:", "44:00:", "44:2A:",
+    "44:D1:", "48:3B:", "48:43:", "48:74:", "4C:32:", "4C:57:",
+    "4C:74:", "4C:B1:", "50:32:", "50:EA:", "54:26:", "54:4E:",
+    "54:99:", "58:40:", "58:55:", "58:7F:", "5C:59:", "5C:95:",
+    "5C:96:", "5C:97:", "5C:F5:", "5C:F7:", "5C:F8:", "60:33:",
+    "60:69:", "60:8C:", "60:92:", "60:9A:", "60:A3:", "60:C5:",
+    "60:F4:", "60:FA:", "60:FB:", "64:20:", "64:76:", "64:9A:",
+    "64:A3:", "64:B0:", "64:B9:", "64:E6:", "68:09:", "68:64:",
+    "68:96:", "68:9C:", "68:A8:", "68:AB:", "68:AE:", "68:D9:",
+    "68:FB:", "6C:19:", "6C:3E:", "6C:70:", "6C:72:", "6C:8D:",
+    "6C:94:", "6C:96:", "6C:AB:", "70:14:", "70:3E:", "70:48:",
+    "70:56:", "70:73:", "70:A2:", "70:CD:", "70:DE:", "70:E7:",
+    "70:EC:", "74:1B:", "74:81:", "74:8D:", "74:E1:", "74:E2:",
+    "78:31:", "78:32:", "78:6C:", "78:7B:", "78:88:", "78:9F:",
+    "78:A3:", "78:CA:", "7C:01:", "7C:04:", "7C:11:", "7C:50:",
+    "7C:6D:", "7C:FA:", "80:00:", "80:49:", "80:82:", "80:92:",
+    "80:B0:", "80:E6:", "84:29:", "84:38:", "84:41:", "84:78:",
+    "84:85:", "84:89:", "84:A1:", "84:B1:", "84:FC:", "88:19:",
+    "88:1F:", "88:53:", "88:66:", "88:C6:", "8C:00:", "8C:29:",
+    "8C:2D:", "8C:7B:", "8C:8E:", "8C:FA:", "90:27:", "90:60:",
+    "90:72:", "90:84:", "90:8D:", "90:B0:", "90:B2:", "90:C1:",
+    "90:FD:", "94:94:", "94:BF:", "94:E9:", "94:F6:", "98:00:",
+    "98:01:", "98:03:", "98:10:", "98:5A:", "98:9E:", "98:B8:",
+    "98:D6:", "98:E0:", "98:F0:", "98:F4:", "98:FE:", "9C:04:",
+    "9C:20:", "9C:29:", "9C:35:", "9C:4F:", "9C:8B:", "9C:F3:",
+    "9C:F4:", "A0:99:", "A0:D7:", "A4:31:", "A4:67:", "A4:B1:",
+    "A4:B8:", "A4:C3:", "A4:D1:", "A4:D9:", "A8:20:", "A8:5B:",
+    "A8:5C:", "A8:66:", "A8:88:", "A8:8E:", "A8:96:", "A8:BB:",
+    "A8:FA:", "AC:1F:", "AC:29:", "AC:3C:", "AC:61:", "AC:7F:",
+    "AC:87:", "AC:BC:", "AC:CF:", "AC:E4:", "AC:FD:", "B0:19:",
+    "B0:34:", "B0:48:", "B0:65:", "B0:70:", "B0:9F:", "B0:CA:",
+    "B0:EC:", "B4:18:", "B4:4B:", "B4:8B:", "B4:F0:", "B8:09:",
+    "B8:17:", "B8:41:", "B8:44:", "B8:53:", "B8:63:", "B8:78:",
+    "B8:8D:", "B8:C1:", "B8:C7:", "B8:E8:", "B8:F6:", "B8:FF:",
+    "BC:3B:", "BC:4C:", "BC:52:", "BC:54:", "BC:67:", "BC:92:",
+    "BC:9F:", "BC:A9:", "BC:EC:", "C0:1A:", "C0:63:", "C0:84:",
+    "C0:A5:", "C0:CC:", "C0:CE:", "C0:D0:", "C0:F2:", "C4:2C:",
+    "C4:98:", "C4:B3:", "C8:1E:", "C8:2A:", "C8:33:", "C8:3C:",
+    "C8:69:", "C8:85:", "C8:B5:", "C8:BC:", "C8:BF:", "C8:D0:",
+    "C8:E0:", "C8:F6:", "CC:08:", "CC:20:", "CC:25:", "CC:29:",
+    "CC:44:", "CC:78:", "CC:7E:", "CC:C7:", "D0:03:", "D0:23:",
+    "D0:25:", "D0:33:", "D0:4B:", "D0:81:", "D0:A6:", "D0:C5:",
+    "D0:D2:", "D0:E1:", "D4:61:", "D4:9A:", "D4:A3:", "D4:DC:",
+    "D4:F4:", "D8:00:", "D8:1D:", "D8:30:", "D8:8F:", "D8:96:",
+    "D8:9E:", "D8:BB:", "D8:CF:", "D8:D1:", "DC:0C:", "DC:2B:",
+    "DC:37:", "DC:41:", "DC:86:", "DC:A4:", "DC:A9:", "DC:D2:",
+    "DC:F7:", "E0:5F:", "E0:66:", "E0:B5:", "E0:B9:", "E0:C7:",
+    "E0:F5:", "E0:F8:", "E4:25:", "E4:2B:", "E4:8B:", "E4:9A:",
+    "E4:C6:", "E4:CE:", "E4:E0:", "E4:E4:", "E8:04:", "E8:06:",
+    "E8:80:", "E8:8D:", "E8:B2:", "EC:35:", "EC:85:", "EC:AD:",
+    "F0:18:", "F0:79:", "F0:98:", "F0:99:", "F0:B0:", "F0:B1:",
+    "F0:C1:", "F0:CB:", "F0:D1:", "F0:DB:", "F0:DC:", "F0:F6:",
+    "F4:0F:", "F4:1B:", "F4:31:", "F4:37:", "F4:5C:", "F4:D4:",
+    "F4:F1:", "F4:F5:", "F8:03:", "F8:1E:", "F8:27:", "F8:38:",
+    "F8:62:", "F8:6F:", "FC:25:", "FC:A8:", "FC:B6:", "FC:D8:",
+    "FC:E9:", "FC:FC:"
+)
+
+def _build_apple_prefix_trie(prefixes):
+    """
+    Build a two-level lookup table from MAC address prefixes.
     
-    try:
-        type_byte = mfg_data[76][0]
+    Args:
+        prefixes: Prefixes of one byte ("AC:") or two bytes ("AC:1F:")
         
-        # Map type byte to device type
-        # Reference: https://github.com/furiousMAC/continuity/blob/master/dissector/packet-bthci_evt.c
-        if type_byte == 0x01:
-            apple_device_type = "Apple AirPods"
-        elif type_byte == 0x02:
-            apple_device_type = "Apple Pencil"
-        elif type_byte == 0x03:
-            apple_device_type = "Apple Watch"
-        elif type_byte == 0x05:
-            apple_device_type = "Apple MacBook"
-        elif type_byte == 0x06:
-            apple_device_type = "Apple iPhone"
-        elif type_byte == 0x07:
-            apple_device_type = "Apple iPad"
-        elif type_byte == 0x09:
-            apple_device_type = "Apple HomePod"
-        elif type_byte == 0x0A:
-            apple_device_type = "Apple TV"
-        elif type_byte == 0x10:
-            apple_device_type = "Apple AirTag"
-        elif type_byte == 0x0C:
-            apple_device_type = "Apple Beats Headphones"
-        elif type_byte == 0x0F:
-            apple_device_type = "Apple AirPods Max"
-        elif type_byte == 0x0B:
-            apple_device_type = "Apple AirPods Pro"
-    except (IndexError, TypeError) as e:
-        # Just continue with the default name
-        pass
-    
-    return apple_device_type
+    Returns:
+        dict: First byte mapped to None (any second byte matches) or
+              to the set of matching second bytes
+    """
+    trie = {}
+    for prefix in prefixes:
+        first, second = prefix[0:2], prefix[3:5]
+        if not second:
+            trie[first] = None
+        elif trie.get(first, ()) is not None:
+            trie.setdefault(first, set()).add(second)
+    return trie
 
+_APPLE_PREFIX_TRIE = _build_apple_prefix_trie(_APPLE_MAC_PREFIXES)
+
+@functools.lru_cache(maxsize=4096)
 def is_likely_apple_device(address):
     """
     Check if a device is likely an Apple device based on its MAC address.
@@ -131,91 +250,126 @@ def is_likely_apple_device(address):
     Returns:
         bool: True if the device is likely an Apple device
     """
-    # Common Apple MAC address prefixes
-    apple_prefixes = [
-        "AC:", "00:C6:", "00:CD:", "88:66:", "98:01:", "7C:9A:",
-        "28:CF:", "54:33:", "C8:2A:", "60:C5:", "68:96:", "24:A0:",
-        "F4:31:", "F0:D1:", "F0:F6:", "F8:1E:", "F8:62:", "FC:E9:",
-        "10:40:", "10:93:", "14:10:", "14:20:", "18:34:", "18:65:",
-        "18:F6:", "1C:36:", "1C:91:", "20:78:", "24:F0:", "28:37:",
-        "28:6A:", "28:E0:", "28:E7:", "34:08:", "34:12:", "34:15:",
-        "34:AB:", "38:0F:", "38:48:", "3C:07:", "3C:D0:", "40:30:",
-        "40:4D:", "40:9C:", "40:A6:", "40:D3:", "44:00:", "44:2A:",
-        "44:D1:", "48:3B:", "48:43:", "48:74:", "4C:32:", "4C:57:",
-        "4C:74:", "4C:B1:", "50:32:", "50:EA:", "54:26:", "54:4E:",
-        "54:99:", "58:40:", "58:55:", "58:7F:", "5C:59:", "5C:95:",
-        "5C:96:", "5C:97:", "5C:F5:", "5C:F7:", "5C:F8:", "60:33:",
-        "60:69:", "60:8C:", "60:92:", "60:9A:", "60:A3:", "60:C5:",
-        "60:F4:", "60:FA:", "60:FB:", "64:20:", "64:76:", "64:9A:",
-        "64:A3:", "64:B0:", "64:B9:", "64:E6:", "68:09:", "68:64:",
-        "68:96:", "68:9C:", "68:A8:", "68:AB:", "68:AE:", "68:D9:",
-        "68:FB:", "6C:19:", "6C:3E:", "6C:70:", "6C:72:", "6C:8D:",
-        "6C:94:", "6C:96:", "6C:AB:", "70:14:", "70:3E:", "70:48:",
-        "70:56:", "70:73:", "70:A2:", "70:CD:", "70:DE:", "70:E7:",
-        "70:EC:", "74:1B:", "74:81:", "74:8D:", "74:E1:", "74:E2:",
-        "78:31:", "78:32:", "78:6C:", "78:7B:", "78:88:", "78:9F:",
-        "78:A3:", "78:CA:", "7C:01:", "7C:04:", "7C:11:", "7C:50:",
-        "7C:6D:", "7C:FA:", "80:00:", "80:49:", "80:82:", "80:92:",
-        "80:B0:", "80:E6:", "84:29:", "84:38:", "84:41:", "84:78:",
-        "84:85:", "84:89:", "84:A1:", "84:B1:", "84:FC:", "88:19:",
-        "88:1F:", "88:53:", "88:66:", "88:C6:", "8C:00:", "8C:29:",
-        "8C:2D:", "8C:7B:", "8C:8E:", "8C:FA:", "90:27:", "90:60:",
-        "90:72:", "90:84:", "90:8D:", "90:B0:", "90:B2:", "90:C1:",
-        "90:FD:", "94:94:", "94:BF:", "94:E9:", "94:F6:", "98:00:",
-        "98:01:", "98:03:", "98:10:", "98:5A:", "98:9E:", "98:B8:",
-        "98:D6:", "98:E0:", "98:F0:", "98:F4:", "98:FE:", "9C:04:",
-        "9C:20:", "9C:29:", "9C:35:", "9C:4F:", "9C:8B:", "9C:F3:",
-        "9C:F4:", "A0:99:", "A0:D7:", "A4:31:", "A4:67:", "A4:B1:",
-        "A4:B8:", "A4:C3:", "A4:D1:", "A4:D9:", "A8:20:", "A8:5B:",
-        "A8:5C:", "A8:66:", "A8:88:", "A8:8E:", "A8:96:", "A8:BB:",
-        "A8:FA:", "AC:1F:", "AC:29:", "AC:3C:", "AC:61:", "AC:7F:",
-        "AC:87:", "AC:BC:", "AC:CF:", "AC:E4:", "AC:FD:", "B0:19:",
-        "B0:34:", "B0:48:", "B0:65:", "B0:70:", "B0:9F:", "B0:CA:",
-        "B0:EC:", "B4:18:", "B4:4B:", "B4:8B:", "B4:F0:", "B8:09:",
-        "B8:17:", "B8:41:", "B8:44:", "B8:53:", "B8:63:", "B8:78:",
-        "B8:8D:", "B8:C1:", "B8:C7:", "B8:E8:", "B8:F6:", "B8:FF:",
-        "BC:3B:", "BC:4C:", "BC:52:", "BC:54:", "BC:67:", "BC:92:",
-        "BC:9F:", "BC:A9:", "BC:EC:", "C0:1A:", "C0:63:", "C0:84:",
-        "C0:A5:", "C0:CC:", "C0:CE:", "C0:D0:", "C0:F2:", "C4:2C:",
-        "C4:98:", "C4:B3:", "C8:1E:", "C8:2A:", "C8:33:", "C8:3C:",
-        "C8:69:", "C8:85:", "C8:B5:", "C8:BC:", "C8:BF:", "C8:D0:",
-        "C8:E0:", "C8:F6:", "CC:08:", "CC:20:", "CC:25:", "CC:29:",
-        "CC:44:", "CC:78:", "CC:7E:", "CC:C7:", "D0:03:", "D0:23:",
-        "D0:25:", "D0:33:", "D0:4B:", "D0:81:", "D0:A6:", "D0:C5:",
-        "D0:D2:", "D0:E1:", "D4:61:", "D4:9A:", "D4:A3:", "D4:DC:",
-        "D4:F4:", "D8:00:", "D8:1D:", "D8:30:", "D8:8F:", "D8:96:",
-        "D8:9E:", "D8:BB:", "D8:CF:", "D8:D1:", "DC:0C:", "DC:2B:",
-        "DC:37:", "DC:41:", "DC:86:", "DC:A4:", "DC:A9:", "DC:D2:",
-        "DC:F7:", "E0:5F:", "E0:66:", "E0:B5:", "E0:B9:", "E0:C7:",
-        "E0:F5:", "E0:F8:", "E4:25:", "E4:2B:", "E4:8B:", "E4:9A:",
-        "E4:C6:", "E4:CE:", "E4:E0:", "E4:E4:", "E8:04:", "E8:06:",
-        "E8:80:", "E8:8D:", "E8:B2:", "EC:35:", "EC:85:", "EC:AD:",
-        "F0:18:", "F0:79:", "F0:98:", "F0:99:", "F0:B0:", "F0:B1:",
-        "F0:C1:", "F0:CB:", "F0:D1:", "F0:DB:", "F0:DC:", "F0:F6:",
-        "F4:0F:", "F4:1B:", "F4:31:", "F4:37:", "F4:5C:", "F4:D4:",
-        "F4:F1:", "F4:F5:", "F8:03:", "F8:1E:", "F8:27:", "F8:38:",
-        "F8:62:", "F8:6F:", "FC:25:", "FC:A8:", "FC:B6:", "FC:D8:",
-        "FC:E9:", "FC:FC:"
-    ]
-    
-    for prefix in apple_prefixes:
-        if address.upper().startswith(prefix):
-            return True
-    
-    return False
+    a = address.upper()
+    if a[2:3] != ':':
+        return False
+    
+    # Look up the first byte, then the second byte only if the first one is not enough
+    second_bytes = _APPLE_PREFIX_TRIE.get(a[0:2], ())
+    if second_bytes is None:
+        return True
+    return a[5:6] == ':' and a[3:5] in second_bytes
+
+# Translation table removing dashes, spaces and other common separators from names
+_NAME_SEPARATORS = str.maketrans('', '', '-:_ ')
+
+def is_mac_address_name(name_str, address_str):
+    """
+    Check if a device name is just a formatted MAC address.
+    
+    Args:
+        name_str (str): Name of the device
+        address_str (str): MAC address of the device
+        
+    Returns:
+        bool: True if the name matches the address once separators are removed
+    """
+    # Remove colons from address
+    clean_addr = address_str.replace(':', '')
+    # Remove dashes and other common separators from name in a single pass
+    clean_name = name_str.translate(_NAME_SEPARATORS)
+    # Names of a different length can't match, so skip lowercasing both strings
+    if len(clean_name) != len(clean_addr):
+        return False
+    # Check if the cleaned name is the same as the cleaned address (case insensitive)
+    return clean_name.lower() == clean_addr.lower()
+
+def _resolve_name(device, adv_data):
+    """
+    Work out a human-readable name for a discovered device.
+    
+    Args:
+        device: Device returned by the scanner
+        adv_data: Advertisement data of the device, or None if not available
+        
+    Returns:
+        tuple: (name, manufacturer) where manufacturer is a " (Manufacturer: X)" suffix or ""
+    """
+    # Get manufacturer data if available using the recommended approach
+    manufacturer = ""
+    manufacturer_id = None
+    
+    # Try to get manufacturer data from advertisement_data (recommended way)
+    mfg_data = getattr(adv_data, 'manufacturer_data', None)
+    if mfg_data:
+        manufacturer_id = next(iter(mfg_data))
+        manufacturer = f" (Manufacturer: {manufacturer_id})"
+    
+    # Try to get name from device
+    device_name = device.name
+    if device_name:
+        # Decode if it's bytes, replacing invalid UTF-8 sequences instead of raising
+        if isinstance(device_name, bytes):
+            device_name = device_name.decode('utf-8', 'replace')
+            
+        # Clean up the name, and use it unless it's empty or just a formatted MAC address
+        name = device_name.strip()
+        if name and not is_mac_address_name(name, device.address):
+            return name, manufacturer
+    
+    # Try to get a better name from advertisement data
+    if adv_data is not None:
+        # Try to get complete local name
+        local_name = getattr(adv_data, 'local_name', None)
+        if local_name:
+            return local_name, manufacturer
+        
+        # Try service data for device type hints
+        service_data = getattr(adv_data, 'service_data', None)
+        if service_data:
+            # Check for common service UUIDs to identify device types
+            # Collect the 16-bit UUIDs (xxxx in 0000xxxx-0000-1000-8000-00805f9b34fb) once
+            uuid16s = {s[4:8].lower() for s in service_data}
+            for uuid16, hint in _SERVICE_HINTS.items():
+                if uuid16 in uuid16s:
+                    return hint, manufacturer
+    
+    # Try to identify common manufacturers and specific device types
+    if manufacturer_id == 76:  # Apple
+        # Always identify as Apple, even if we can't determine the specific type.
+        # The manufacturer info is dropped since it would duplicate the name
+        return identify_apple_device(mfg_data), ""
+    if manufacturer_id is not None:
+        # Known manufacturers get their name, other ones at least show "Device (Manufacturer: X)"
+        return _MANUFACTURER_NAMES.get(manufacturer_id, "Device"), manufacturer
+    
+    # If the address follows Apple patterns, make an educated guess
+    if is_likely_apple_device(device.address):
+        return "Likely Apple Device", manufacturer
+    
+    return "Unknown Device", manufacturer
 
-async def scan_devices(duration=10):
+async def scan_devices(duration=10, scanner=None, latest=None):
     """
     Scan for nearby BLE devices.
     
     Args:
         duration (int): Duration of scan in seconds
+        scanner (BleakScanner, optional): Already running scanner to collect the
+                                          devices from instead of a new discovery
+        latest (dict, optional): The dict updated by the callback of scanner
+                                 (see make_rssi_callback), read first for the RSSI
         
     Returns:
         List of discovered devices
     """
     print(f"Scanning for Bluetooth devices for {duration} seconds...")
-    devices = await BleakScanner.discover(timeout=duration)
+    if scanner is None:
+        devices = await BleakScanner.discover(timeout=duration)
+    else:
+        # Let the running scanner collect advertisements for the scan duration
+        await asyncio.sleep(duration)
+        devices = scanner.discovered_devices
     
     if not devices:
         print("No devices found.")
@@ -223,120 +377,77 @@ async def scan_devices(duration=10):
     
     print("\nDevices found:")
     for i, device in enumerate(devices):
-        # Access RSSI - try multiple approaches to ensure we get a value
-        rssi = 'Unknown'
+        # Advertisement data is None when this version of bleak does not provide it
+        adv_data = getattr(device, 'advertisement_data', None)
         
-        # First try the recommended approach with advertisement_data
-        if hasattr(device, 'advertisement_data') and hasattr(device.advertisement_data, 'rssi'):
-            rssi = device.advertisement_data.rssi
+        # Access RSSI - try multiple approaches to ensure we get a value
+        # First use the latest advertisement recorded by the shared scanner's callback
+        reading = latest.get(device.address.lower()) if latest is not None else None
+        rssi = reading[0] if reading else None
         
-        # If that didn't work, try the direct property (with warning suppression)
-        if rssi == 'Unknown' and hasattr(device, 'rssi'):
-            rssi = device.rssi
-                
-        # If we still don't have a value, try other properties that might contain RSSI
-        if rssi == 'Unknown' and hasattr(device, 'metadata') and 'rssi' in device.metadata:
-            rssi = device.metadata['rssi']
+        # Then try the recommended approach with advertisement_data
+        if rssi is None:
+            rssi = getattr(adv_data, 'rssi', None)
         
-        # Get a human-readable name
-        name = "Unknown Device"
+        # If that didn't work, try the direct property
+        if rssi is None:
+            rssi = getattr(device, 'rssi', None)
         
-        # Function to check if name is just a formatted MAC address
-        def is_mac_address_name(name_str, address_str):
-            # Remove colons from address
-            clean_addr = address_str.replace(':', '')
-            # Remove dashes and other common separators from name
-            clean_name = name_str.replace('-', '').replace(':', '').replace('_', '')
-            # Check if the cleaned name is the same as the cleaned address (case insensitive)
-            return clean_name.lower() == clean_addr.lower()
+        # If we still don't have a value, try other properties that might contain RSSI
+        if rssi is None:
+            rssi = (getattr(device, 'metadata', None) or {}).get('rssi', 'Unknown')
         
-        # Try to get name from device
-        if device.name:
-            # Try to decode if it's bytes
-            if isinstance(device.name, bytes):
-                try:
-                    name = device.name.decode('utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        name = device.name.decode('ascii', errors='replace')
-                    except Exception:
-                        name = str(device.name)
-            else:
-                name = str(device.name)
-                
-            # Clean up the name
-            name = name.strip()
-            if not name:
-                name = "Unknown Device"
-                
-            # Check if name is just a formatted MAC address
-            if is_mac_address_name(name, device.address):
-                name = "Unknown Device"
+        # Get a human-readable name and the manufacturer suffix
+        name, manufacturer = _resolve_name(device, adv_data)
         
-        # Try to get a better name from advertisement data
-        if name == "Unknown Device" and hasattr(device, 'advertisement_data'):
-            adv_data = device.advertisement_data
-            
-            # Try to get complete local name
-            if hasattr(adv_data, 'local_name') and adv_data.local_name:
-                name = adv_data.local_name
-            
-            # Try service data for device type hints
-            if name == "Unknown Device" and hasattr(adv_data, 'service_data') and adv_data.service_data:
-                # Check for common service UUIDs to identify device types
-                services = list(adv_data.service_data.keys())
-                if services:
-                    if any('1800' in s.lower() for s in services):  # Generic Access Profile
-                        name = "Generic BLE Device"
-                    elif any('180f' in s.lower() for s in services):  # Battery Service
-                        name = "Battery-powered Device"
-                    elif any('180a' in s.lower() for s in services):  # Device Information
-                        name = "BLE Device"
-                    elif any('1812' in s.lower() for s in services):  # HID Service
-                        name = "HID Device (Keyboard/Mouse)"
-                    elif any('1802' in s.lower() for s in services):  # Immediate Alert
-                        name = "Alert Device"
-                    elif any('1803' in s.lower() for s in services):  # Link Loss
-                        name = "Proximity Device"
+        print(f"{i+1}. Address: {device.address} - Name: {name}{manufacturer} - RSSI: {rssi} dB")
+    
+    return devices
+
+def make_rssi_callback(latest):
+    """
+    Create a BleakScanner detection callback that records the RSSI of devices.
+    
+    Args:
+        latest (dict): Updated with lower-case address -> (rssi, time.monotonic())
+                       on every advertisement received
         
-        # Get manufacturer data if available using the recommended approach
-        manufacturer = ""
-        manufacturer_id = None
-        mfg_data = None
+    Returns:
+        Function to pass as the detection_callback of a BleakScanner
+    """
+    def on_advertisement(found_device, advertisement_data):
+        latest[found_device.address.lower()] = (advertisement_data.rssi, time.monotonic())
+    
+    return on_advertisement
+
+async def find_discovered_device(scanner, address, timeout=10.0):
+    """
+    Wait for a device to be seen by an already running scanner.
+    
+    Args:
+        scanner (BleakScanner): Running scanner
+        address (str): MAC address or device identifier
+        timeout (float): Maximum time to wait in seconds
         
-        # Try to get manufacturer data from advertisement_data (recommended way)
-        if hasattr(device, 'advertisement_data') and hasattr(device.advertisement_data, 'manufacturer_data'):
-            mfg_data = device.advertisement_data.manufacturer_data
-            if mfg_data and len(mfg_data) > 0:
-                manufacturer_id = list(mfg_data.keys())[0]
-                manufacturer = f" (Manufacturer: {manufacturer_id})"
+    Returns:
+        The discovered device, or None if it was not seen before the timeout
+    """
+    addr_lower = address.lower()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    while True:
+        for found_device in scanner.discovered_devices:
+            if found_device.address.lower() == addr_lower:
+                return found_device
         
-        # Try to identify common manufacturers and specific device types
-        if name == "Unknown Device":
-            if manufacturer_id is not None:
-                if manufacturer_id == 76:  # Apple
-                    # Always identify as Apple, even if we can't determine the specific type
-                    name = identify_apple_device(mfg_data)
-                    # Remove the duplicate manufacturer info since it's in the name
-                    manufacturer = ""
-                elif manufacturer_id == 6:  # Microsoft
-                    name = "Microsoft Device"
-                elif manufacturer_id == 224:  # Google
-                    name = "Google Device"
-                elif manufacturer_id == 117:  # Samsung
-                    name = "Samsung Device"
-                else:
-                    # For other manufacturers, at least show "Device (Manufacturer: X)"
-                    name = f"Device"
-            # If we still don't have a name and the address follows Apple patterns, make an educated guess
-            elif name == "Unknown Device" and is_likely_apple_device(device.address):
-                name = "Likely Apple Device"
+        if loop.time() >= deadline:
+            return None
         
-        print(f"{i+1}. Address: {device.address} - Name: {name}{manufacturer} - RSSI: {rssi} dB")
-    
-    return devices
+        await asyncio.sleep(0.5)
 
-async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0):
+async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0,
+                                  scanner=None, latest=None):
     """
     Monitor the signal strength of a BLE device.
     
@@ -346,10 +457,27 @@ async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power
         duration (int, optional): Total monitoring duration in seconds
         tx_power (int): Calibration value for distance estimation
         n_factor (float): Path loss exponent for distance estimation
+        scanner (BleakScanner, optional): Already running scanner to share, created
+                                          with detection_callback=make_rssi_callback(latest)
+        latest (dict, optional): The dict updated by the callback of scanner,
+                                 required when scanner is given
+        
+    Raises:
+        ValueError: If scanner is given without latest
     """
+    if scanner is not None and latest is None:
+        raise ValueError("latest must be given together with scanner")
+    
+    addr_lower = address.lower()
+    # A shared scanner is started and stopped by its owner
+    own_scanner = scanner is None
+    
     # First scan to get the device
     print(f"Looking for device with address: {address}")
-    device = await BleakScanner.find_device_by_address(address, timeout=10.0)
+    if own_scanner:
+        device = await BleakScanner.find_device_by_address(address, timeout=10.0)
+    else:
+        device = await find_discovered_device(scanner, address, timeout=10.0)
     
     if not device:
         print(f"Device with address {address} not found. Make sure it's powered on and in range.")
@@ -358,84 +486,70 @@ async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power
     print(f"Found device: {device.address} - {device.name or 'Unknown'}")
     
     # We'll use a scanner to continuously get RSSI without maintaining a connection
-    # This works better for devices that don't allow connections or have limited services
-    scanner = BleakScanner()
+    # This works better for devices that don't allow connections or have limited services.
+    # The scanner runs for the whole session and the callback keeps the latest
+    # advertisement of every device by address, so no advertisement is missed
+    # between readings and our device is found with a single lookup.
+    if own_scanner:
+        latest = {}
+        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
     
     print("\nMonitoring signal strength...")
     print("(Press Ctrl+C to stop)")
     
-    start_time = time.time()
+    # Monotonic event loop clock; without a duration the deadline is never reached
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration if duration else float('inf')
     count = 0
+    # The distance estimation base only depends on the calibration values,
+    # so it is computed once for the whole run
+    distance_base = _distance_base(n_factor)
+    # Advertisements older than one monitoring cycle (the former 1 second scan
+    # window plus the interval) mean the device is no longer in range
+    max_age = interval + 1.0
+    # Bind the write method once: each reading is emitted with a single write call
+    stdout_write = sys.stdout.write
     
     try:
+        if own_scanner:
+            await scanner.start()
+        
         while True:
-            if duration and (time.time() - start_time) > duration:
+            if loop.time() > deadline:
                 break
                 
-            # Scan for the device to get updated RSSI
-            await scanner.start()
-            await asyncio.sleep(1.0)  # Give it time to scan
-            
-            # Use the property instead of the deprecated method
-            devices = scanner.discovered_devices
-            await scanner.stop()
+            # Wait for the next interval while the scanner collects advertisements
+            await asyncio.sleep(interval)
             
-            # Find our device in the scan results
-            target_device = next((d for d in devices if d.address.lower() == address.lower()), None)
+            # Find the latest advertisement of our device
+            reading = latest.get(addr_lower)
             
             count += 1
-            timestamp = datetime.now().strftime("%H:%M:%S")
+            timestamp = time.strftime("%H:%M:%S")
             
-            if target_device:
-                # Get RSSI safely from advertisement data if available
-                rssi = None
-                
-                # Try multiple approaches to get RSSI
-                rssi = None
+            if reading and time.monotonic() - reading[1] <= max_age:
+                rssi = reading[0]
                 
-                # Try to get RSSI from advertisements (recommended approach)
-                if hasattr(scanner, 'advertisements'):
-                    for adv in scanner.advertisements.values():
-                        if adv.device.address.lower() == address.lower():
-                            rssi = adv.rssi
-                            break
+                # Estimate distance based on RSSI using the provided calibration values
+                distance = _distance_from_base(distance_base, tx_power, rssi)
+                distance_desc = get_distance_description(distance)
                 
-                # If that didn't work, try the direct property (with warning suppression)
-                if rssi is None and hasattr(target_device, 'rssi'):
-                    import warnings
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        rssi = target_device.rssi
-                        
-                # If we still don't have a value, try other properties that might contain RSSI
-                if rssi is None and hasattr(target_device, 'metadata') and 'rssi' in target_device.metadata:
-                    rssi = target_device.metadata['rssi']
+                # Print signal strength with a simple bar visualization
+                bars = int(rssi + 100) // 10
+                bar_str = _BARS[0 if bars < 0 else 10 if bars > 10 else bars]
                 
-                if rssi is not None:
-                    # Estimate distance based on RSSI using the provided calibration values
-                    distance = estimate_distance(rssi, tx_power, n_factor)
-                    distance_desc = get_distance_description(distance)
-                    
-                    # Print signal strength with a simple bar visualization
-                    bars = min(10, max(0, int((rssi + 100) / 10)))
-                    bar_str = '█' * bars + '░' * (10 - bars)
-                    
-                    print(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]")
-                    print(f"                      Estimated Distance: {distance} meters ({distance_desc})")
-                else:
-                    print(f"[{timestamp}] Reading #{count}: Device found but could not get RSSI value.")
+                stdout_write(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]\n"
+                             f"                      Estimated Distance: {distance} meters ({distance_desc})\n")
             else:
                 print(f"[{timestamp}] Reading #{count}: Device not found in scan results. It may be out of range.")
             
-            # Wait for the next interval
-            await asyncio.sleep(interval)
-            
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        await scanner.stop()
+        if own_scanner:
+            await scanner.stop()
 
 async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0):
     """
@@ -451,73 +565,68 @@ async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59
         n_factor (float): Path loss exponent for distance estimation
     """
     print(f"\nAttempting to connect to device: {address}")
+    addr_lower = address.lower()
     
     try:
         async with BleakClient(address) as client:
             if client.is_connected:
                 print("Connected successfully!")
                 
-                start_time = time.time()
+                # Monotonic event loop clock; without a duration the deadline is never reached
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + duration if duration else float('inf')
                 count = 0
+                # Distance estimation base, computed once (see monitor_signal_strength)
+                distance_base = _distance_base(n_factor)
+                
+                # Direct RSSI support does not change during the connection, so check it once
+                has_direct_rssi = hasattr(client, 'rssi')
+                scanner = None
+                latest = {}
+                # Advertisements older than one cycle (the former 0.5 second scan window
+                # plus the interval) are no longer a valid reading
+                max_age = interval + 0.5
+                # Bind the write method once: each reading is emitted with a single write call
+                stdout_write = sys.stdout.write
                 
                 try:
+                    if not has_direct_rssi:
+                        # Fall back to scanner if direct RSSI not available,
+                        # keeping a single scanner running for the whole session
+                        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
+                        await scanner.start()
+                        await asyncio.sleep(0.5)  # Give it time to see a first advertisement
+                    
                     while True:
-                        if duration and (time.time() - start_time) > duration:
+                        if loop.time() > deadline:
                             break
                             
                         # Get current time for timestamp
-                        timestamp = datetime.now().strftime("%H:%M:%S")
+                        timestamp = time.strftime("%H:%M:%S")
                         
                         # For connected devices, we can directly get the RSSI
                         rssi = None
-                        if hasattr(client, 'rssi'):
+                        if has_direct_rssi:
                             rssi = await client.get_rssi()
                         else:
-                            # Fall back to scanner if direct RSSI not available
-                            scanner = BleakScanner()
-                            await scanner.start()
-                            await asyncio.sleep(0.5)
-                            
-                            # Use the property instead of the deprecated method
-                            devices = scanner.discovered_devices
-                            await scanner.stop()
-                            
-                            # Try multiple approaches to get RSSI
-                            rssi = None
-                            
-                            # Try to get RSSI from advertisements (recommended approach)
-                            if hasattr(scanner, 'advertisements'):
-                                for adv in scanner.advertisements.values():
-                                    if adv.device.address.lower() == address.lower():
-                                        rssi = adv.rssi
-                                        break
-                            
-                            # If that didn't work, try the direct property (with warning suppression)
-                            if rssi is None:
-                                device = next((d for d in devices if d.address.lower() == address.lower()), None)
-                                if device and hasattr(device, 'rssi'):
-                                    import warnings
-                                    with warnings.catch_warnings():
-                                        warnings.simplefilter("ignore")
-                                        rssi = device.rssi
-                                        
-                            # If we still don't have a value, try other properties that might contain RSSI
-                            if rssi is None and device and hasattr(device, 'metadata') and 'rssi' in device.metadata:
-                                rssi = device.metadata['rssi']
+                            # Otherwise use the latest advertisement seen by the fallback scanner
+                            reading = latest.get(addr_lower)
+                            if reading and time.monotonic() - reading[1] <= max_age:
+                                rssi = reading[0]
                         
                         count += 1
                         
                         if rssi is not None:
                             # Estimate distance based on RSSI using the provided calibration values
-                            distance = estimate_distance(rssi, tx_power, n_factor)
+                            distance = _distance_from_base(distance_base, tx_power, rssi)
                             distance_desc = get_distance_description(distance)
                             
                             # Print signal strength with a simple bar visualization
-                            bars = min(10, max(0, int((rssi + 100) / 10)))
-                            bar_str = '█' * bars + '░' * (10 - bars)
+                            bars = int(rssi + 100) // 10
+                            bar_str = _BARS[0 if bars < 0 else 10 if bars > 10 else bars]
                             
-                            print(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]")
-                            print(f"                      Estimated Distance: {distance} meters ({distance_desc})")
+                            stdout_write(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]\n"
+                                         f"                      Estimated Distance: {distance} meters ({distance_desc})\n")
                         else:
                             print(f"[{timestamp}] Reading #{count}: Could not get signal strength.")
                         
@@ -525,6 +634,9 @@ async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59
                         
                 except KeyboardInterrupt:
                     print("\nMonitoring stopped by user")
+                finally:
+                    if scanner is not None:
+                        await scanner.stop()
             else:
                 print("Failed to connect. Device may not be connectable or may be out of range.")
                 # Fall back to monitoring without connection
@@ -549,30 +661,43 @@ async def main_async():
     
     args = parser.parse_args()
     
-    if args.scan or not args.address:
-        devices = await scan_devices(args.time)
-        if not args.address and devices:
-            # If no address provided but devices found, ask user to select one
-            try:
-                choice = int(input("\nEnter the number of the device to monitor (0 to exit): "))
-                if choice > 0 and choice <= len(devices):
-                    args.address = devices[choice-1].address
-                else:
-                    print("Exiting...")
+    # Without --connect a single scanner serves both the device scan and the
+    # monitoring session, so the adapter is only started and stopped once
+    scanner = None
+    latest = {}
+    if not args.connect:
+        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
+        await scanner.start()
+    
+    try:
+        if args.scan or not args.address:
+            devices = await scan_devices(args.time, scanner, latest)
+            if not args.address and devices:
+                # If no address provided but devices found, ask user to select one
+                try:
+                    choice = int(input("\nEnter the number of the device to monitor (0 to exit): "))
+                    if choice > 0 and choice <= len(devices):
+                        args.address = devices[choice-1].address
+                    else:
+                        print("Exiting...")
+                        return
+                except (ValueError, IndexError):
+                    print("Invalid selection. Exiting...")
                     return
-            except (ValueError, IndexError):
-                print("Invalid selection. Exiting...")
-                return
-    
-    if args.address:
-        # Get the calibration values
-        tx_power = args.power
-        n_factor = args.factor
         
-        if args.connect:
-            await connect_and_monitor(args.address, args.interval, args.duration, tx_power, n_factor)
-        else:
-            await monitor_signal_strength(args.address, args.interval, args.duration, tx_power, n_factor)
+        if args.address:
+            # Get the calibration values
+            tx_power = args.power
+            n_factor = args.factor
+            
+            if args.connect:
+                await connect_and_monitor(args.address, args.interval, args.duration, tx_power, n_factor)
+            else:
+                await monitor_signal_strength(args.address, args.interval, args.duration, tx_power, n_factor,
+                                              scanner, latest)
+    finally:
+        if scanner is not None:
+            await scanner.stop()
 
 def main():
     """Entry point for the script."""
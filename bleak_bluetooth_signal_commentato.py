@@ -16,10 +16,15 @@ import asyncio  # Libreria per la programmazione asincrona
 import argparse  # Libreria per gestire gli argomenti da linea di comando
 import time  # Libreria per funzioni relative al tempo
 import sys  # Libreria per interagire con il sistema
-import math  # Libreria per funzioni matematiche
 import warnings  # Libreria per gestire gli avvisi
+import functools  # Libreria per la memorizzazione dei risultati (cache)
+from bisect import bisect_right  # Ricerca binaria in una sequenza ordinata
 from bleak import BleakScanner, BleakClient  # Libreria Bleak per interagire con dispositivi Bluetooth LE
-from datetime import datetime  # Libreria per gestire date e orari
+
+# Bleak segnala come deprecati BLEDevice.rssi e BLEDevice.metadata, usati solo come ripiego:
+# il filtro viene installato una sola volta all'importazione, così le funzioni restano
+# silenziose anche quando vengono usate da un altro modulo invece che tramite main()
+warnings.filterwarnings("ignore", message=r"BLEDevice\.\w+ is deprecated", category=FutureWarning)
 
 def estimate_distance(rssi, tx_power=-59, n=2.0):
     """
@@ -33,14 +38,52 @@ def estimate_distance(rssi, tx_power=-59, n=2.0):
     Returns:
         float: Distanza stimata in metri
     """
+    return _distance_from_base(_distance_base(n), tx_power, rssi)  # Un'unica implementazione del modello
+
+def _distance_base(n):
+    """
+    Precalcola la base del modello di perdita del percorso per un dato esponente.
+    
+    Il modello 10 ** ((tx_power - rssi) / (10 * n)) è uguale a base ** (tx_power - rssi),
+    quindi i cicli di monitoraggio calcolano la base una sola volta e la riusano ad ogni lettura.
+    
+    Args:
+        n (float): L'esponente di perdita del percorso
+        
+    Returns:
+        float: La base da passare a _distance_from_base()
+    """
+    return 10.0 ** (1.0 / (10.0 * n))
+
+def _distance_from_base(base, tx_power, rssi):
+    """
+    Stima la distanza approssimativa a partire da una base precalcolata.
+    
+    Args:
+        base (float): Valore restituito da _distance_base()
+        tx_power (int): Il valore RSSI a 1 metro di distanza (valore di calibrazione)
+        rssi (int): Il valore RSSI in dBm
+        
+    Returns:
+        float: Distanza stimata in metri, o -1 se RSSI è zero (non valido)
+    """
     if rssi == 0:
         return -1.0  # Restituisce -1 se RSSI è zero (non valido)
     
-    # Calcola la distanza utilizzando il modello di perdita del percorso
-    ratio = (tx_power - rssi) / (10 * n)
-    distance = math.pow(10, ratio)
-    
-    return round(distance, 2)  # Arrotonda a 2 decimali
+    return round(base ** (tx_power - rssi), 2)  # Arrotonda a 2 decimali
+
+# Soglie delle fasce di distanza in metri e relative descrizioni:
+# la descrizione i-esima vale per le distanze comprese tra la soglia i-1 (inclusa) e la soglia i (esclusa)
+_DISTANCE_THRESHOLDS = (0.0, 0.5, 1.0, 2.0, 5.0, 10.0)
+_DISTANCE_LABELS = (
+    "Unknown",  # Distanza sconosciuta
+    "Very close (< 0.5m)",  # Molto vicino
+    "Close (< 1m)",  # Vicino
+    "Near (1-2m)",  # Nelle vicinanze
+    "Medium distance (2-5m)",  # Media distanza
+    "Far (5-10m)",  # Lontano
+    "Very far (> 10m)",  # Molto lontano
+)
 
 def get_distance_description(distance):
     """
@@ -52,21 +95,29 @@ def get_distance_description(distance):
     Returns:
         str: Descrizione della distanza
     """
-    # Restituisce una descrizione testuale in base alla distanza calcolata
-    if distance < 0:
-        return "Unknown"  # Distanza sconosciuta
-    elif distance < 0.5:
-        return "Very close (< 0.5m)"  # Molto vicino
-    elif distance < 1.0:
-        return "Close (< 1m)"  # Vicino
-    elif distance < 2.0:
-        return "Near (1-2m)"  # Nelle vicinanze
-    elif distance < 5.0:
-        return "Medium distance (2-5m)"  # Media distanza
-    elif distance < 10.0:
-        return "Far (5-10m)"  # Lontano
-    else:
-        return "Very far (> 10m)"  # Molto lontano
+    # Trova con una ricerca binaria la fascia in cui cade la distanza calcolata
+    return _DISTANCE_LABELS[bisect_right(_DISTANCE_THRESHOLDS, distance)]
+
+# Barre di visualizzazione della potenza del segnale, da 0 a 10 blocchi pieni,
+# costruite una sola volta invece che ad ogni lettura
+_BARS = tuple('█' * bars + '░' * (10 - bars) for bars in range(11))
+
+# Mappa il byte del tipo nei dati del produttore Apple al tipo di dispositivo
+# Riferimento: https://github.com/furiousMAC/continuity/blob/master/dissector/packet-bthci_evt.c
+_APPLE_TYPE_MAP = {
+    0x01: "Apple AirPods",
+    0x02: "Apple Pencil",
+    0x03: "Apple Watch",
+    0x05: "Apple MacBook",
+    0x06: "Apple iPhone",
+    0x07: "Apple iPad",
+    0x09: "Apple HomePod",
+    0x0A: "Apple TV",
+    0x0B: "Apple AirPods Pro",
+    0x0C: "Apple Beats Headphones",
+    0x0F: "Apple AirPods Max",
+    0x10: "Apple AirTag",
+}
 
 def identify_apple_device(mfg_data):
     """
@@ -78,52 +129,63 @@ def identify_apple_device(mfg_data):
     Returns:
         str: Tipo di dispositivo Apple identificato o "Apple Device" se sconosciuto
     """
-    apple_device_type = "Apple Device"  # Valore predefinito
+    # Senza dati del produttore Apple, o con troppo pochi byte, identifica comunque come Apple
+    data = mfg_data.get(76) if mfg_data else None  # Un solo accesso al dizionario
+    if not data or len(data) < 2:
+        return "Apple Device"
     
-    # Se non abbiamo dati del produttore, restituisce comunque "Apple Device"
-    if not mfg_data or 76 not in mfg_data:
-        return apple_device_type
-    
-    # Se abbiamo dati del produttore ma non abbastanza byte, identifica comunque come Apple
-    if 76 in mfg_data and len(mfg_data[76]) < 2:
-        return apple_device_type
+    # Il primo byte nei dati del produttore indica il tipo di dispositivo Apple
+    return _APPLE_TYPE_MAP.get(data[0], "Apple Device")
+
+# Nomi dei produttori comuni non Apple, indicizzati per ID aziendale Bluetooth SIG
+_MANUFACTURER_NAMES = {
+    6: "Microsoft Device",
+    224: "Google Device",
+    117: "Samsung Device",
+}
+
+# UUID di servizio comuni (a 16 bit) usati per identificare i tipi di dispositivo, in ordine di priorità
+_SERVICE_HINTS = {
+    '1800': "Generic BLE Device",  # Generic Access Profile
+    '180f': "Battery-powered Device",  # Battery Service
+    '180a': "BLE Device",  # Device Information
+    '1812': "HID Device (Keyboard/Mouse)",  # HID Service
+    '1802': "Alert Device",  # Immediate Alert
+    '1803': "Proximity Device",  # Link Loss
+}
+
+# Prefissi comuni degli indirizzi MAC Apple
+# Questa è una lista estesa di prefissi MAC noti utilizzati da Apple
+_APPLE_MAC_PREFIXES = (
+    "AC:", "00:C6:", "00:CD:", "88:66:", "98:01:", "7C:9A:",
+    # ... (lista molto lunga di prefissi MAC di Apple)
+    "FC:E9:", "FC:FC:"
+)
+
+def _build_apple_prefix_trie(prefixes):
+    """
+    Costruisce una tabella di ricerca a due livelli dai prefissi degli indirizzi MAC.
     
-    try:
-        # Il primo byte nei dati del produttore indica il tipo di dispositivo Apple
-        type_byte = mfg_data[76][0]
+    Args:
+        prefixes: Prefissi di un byte ("AC:") o di due byte ("AC:1F:")
         
-        # Mappa il byte del tipo al tipo di dispositivo
-        # Riferimento: https://github.com/furiousMAC/continuity/blob/master/dissector/packet-bthci_evt.c
-        if type_byte == 0x01:
-            apple_device_type = "Apple AirPods"
-        elif type_byte == 0x02:
-            apple_device_type = "Apple Pencil"
-        elif type_byte == 0x03:
-            apple_device_type = "Apple Watch"
-        elif type_byte == 0x05:
-            apple_device_type = "Apple MacBook"
-        elif type_byte == 0x06:
-            apple_device_type = "Apple iPhone"
-        elif type_byte == 0x07:
-            apple_device_type = "Apple iPad"
-        elif type_byte == 0x09:
-            apple_device_type = "Apple HomePod"
-        elif type_byte == 0x0A:
-            apple_device_type = "Apple TV"
-        elif type_byte == 0x10:
-            apple_device_type = "Apple AirTag"
-        elif type_byte == 0x0C:
-            apple_device_type = "Apple Beats Headphones"
-        elif type_byte == 0x0F:
-            apple_device_type = "Apple AirPods Max"
-        elif type_byte == 0x0B:
-            apple_device_type = "Apple AirPods Pro"
-    except (IndexError, TypeError) as e:
-        # Continua con il nome predefinito in caso di errore
-        pass
-    
-    return apple_device_type  # Restituisce il tipo di dispositivo identificato
+    Returns:
+        dict: Primo byte associato a None (qualsiasi secondo byte corrisponde) o
+              all'insieme dei secondi byte corrispondenti
+    """
+    trie = {}
+    for prefix in prefixes:
+        first, second = prefix[0:2], prefix[3:5]  # Primo e (eventuale) secondo byte del prefisso
+        if not second:
+            trie[first] = None  # Il primo byte basta da solo
+        elif trie.get(first, ()) is not None:
+            trie.setdefault(first, set()).add(second)  # Serve anche il secondo byte
+    return trie
+
+# Tabella costruita una sola volta all'importazione del modulo
+_APPLE_PREFIX_TRIE = _build_apple_prefix_trie(_APPLE_MAC_PREFIXES)
 
+@functools.lru_cache(maxsize=4096)
 def is_likely_apple_device(address):
     """
     Controlla se un dispositivo è probabilmente un dispositivo Apple in base al suo indirizzo MAC.
@@ -134,33 +196,128 @@ def is_likely_apple_device(address):
     Returns:
         bool: True se il dispositivo è probabilmente un dispositivo Apple
     """
-    # Prefissi comuni degli indirizzi MAC Apple
-    # Questa è una lista estesa di prefissi MAC noti utilizzati da Apple
-    apple_prefixes = [
-        "AC:", "00:C6:", "00:CD:", "88:66:", "98:01:", "7C:9A:",
-        # ... (lista molto lunga di prefissi MAC di Apple)
-        "FC:E9:", "FC:FC:"
-    ]
+    # Converte l'indirizzo in maiuscolo una sola volta
+    a = address.upper()
+    if a[2:3] != ':':
+        return False  # Non è nel formato di un indirizzo MAC
     
-    # Controlla se l'indirizzo inizia con uno dei prefissi Apple
-    for prefix in apple_prefixes:
-        if address.upper().startswith(prefix):
-            return True
+    # Cerca il primo byte, poi il secondo byte solo se il primo non basta
+    second_bytes = _APPLE_PREFIX_TRIE.get(a[0:2], ())
+    if second_bytes is None:
+        return True  # Il primo byte corrisponde a un prefisso Apple
+    return a[5:6] == ':' and a[3:5] in second_bytes
+
+# Tabella di traduzione che rimuove trattini, spazi e altri separatori comuni dai nomi
+_NAME_SEPARATORS = str.maketrans('', '', '-:_ ')
+
+def is_mac_address_name(name_str, address_str):
+    """
+    Verifica se il nome è solo un indirizzo MAC formattato.
     
-    return False  # Non è un dispositivo Apple in base al prefisso MAC
+    Args:
+        name_str (str): Nome del dispositivo
+        address_str (str): Indirizzo MAC del dispositivo
+        
+    Returns:
+        bool: True se il nome corrisponde all'indirizzo senza separatori
+    """
+    # Rimuove i due punti dall'indirizzo
+    clean_addr = address_str.replace(':', '')
+    # Rimuove trattini e altri separatori comuni dal nome in un solo passaggio
+    clean_name = name_str.translate(_NAME_SEPARATORS)
+    # Nomi di lunghezza diversa non possono coincidere: evita di convertire in minuscolo entrambe le stringhe
+    if len(clean_name) != len(clean_addr):
+        return False
+    # Controlla se il nome pulito è lo stesso dell'indirizzo pulito (case insensitive)
+    return clean_name.lower() == clean_addr.lower()
 
-async def scan_devices(duration=10):
+def _resolve_name(device, adv_data):
+    """
+    Determina un nome leggibile per un dispositivo scoperto.
+    
+    Args:
+        device: Dispositivo restituito dallo scanner
+        adv_data: Dati di advertisement del dispositivo, o None se non disponibili
+        
+    Returns:
+        tuple: (nome, produttore) dove produttore è il suffisso " (Manufacturer: X)" oppure ""
+    """
+    # Ottiene i dati del produttore se disponibili utilizzando l'approccio consigliato
+    manufacturer = ""
+    manufacturer_id = None
+    
+    # Prova a ottenere i dati del produttore da advertisement_data (modo consigliato)
+    mfg_data = getattr(adv_data, 'manufacturer_data', None)
+    if mfg_data:
+        manufacturer_id = next(iter(mfg_data))
+        manufacturer = f" (Manufacturer: {manufacturer_id})"
+    
+    # Prova a ottenere il nome dal dispositivo
+    device_name = device.name
+    if device_name:
+        # Decodifica se è in bytes: le sequenze UTF-8 non valide vengono sostituite invece di sollevare un'eccezione
+        if isinstance(device_name, bytes):
+            device_name = device_name.decode('utf-8', 'replace')
+            
+        # Pulisce il nome e lo usa, a meno che non sia vuoto o solo un indirizzo MAC formattato
+        name = device_name.strip()
+        if name and not is_mac_address_name(name, device.address):
+            return name, manufacturer  # Uscita anticipata: le ricerche successive non servono
+    
+    # Prova a ottenere un nome migliore dai dati di advertisement
+    if adv_data is not None:
+        # Prova a ottenere il nome locale completo
+        local_name = getattr(adv_data, 'local_name', None)
+        if local_name:
+            return local_name, manufacturer
+        
+        # Prova i dati di servizio per suggerimenti sul tipo di dispositivo
+        service_data = getattr(adv_data, 'service_data', None)
+        if service_data:
+            # Controlla gli UUID di servizio comuni per identificare i tipi di dispositivo
+            # Estrae una sola volta gli UUID a 16 bit (xxxx in 0000xxxx-0000-1000-8000-00805f9b34fb)
+            uuid16s = {s[4:8].lower() for s in service_data}
+            # Usa il primo suggerimento, in ordine di priorità, tra i servizi pubblicizzati
+            for uuid16, hint in _SERVICE_HINTS.items():
+                if uuid16 in uuid16s:
+                    return hint, manufacturer
+    
+    # Prova a identificare produttori comuni e tipi di dispositivo specifici
+    if manufacturer_id == 76:  # Apple
+        # Identifica sempre come Apple, anche se non possiamo determinare il tipo specifico;
+        # le informazioni del produttore vengono rimosse poiché sarebbero duplicate nel nome
+        return identify_apple_device(mfg_data), ""
+    if manufacturer_id is not None:
+        # I produttori noti ricevono il loro nome, per gli altri mostra almeno "Device (Manufacturer: X)"
+        return _MANUFACTURER_NAMES.get(manufacturer_id, "Device"), manufacturer  # Una sola ricerca nel dizionario
+    
+    # Se l'indirizzo segue i modelli Apple, fai una stima educata
+    if is_likely_apple_device(device.address):
+        return "Likely Apple Device", manufacturer
+    
+    return "Unknown Device", manufacturer  # Nome predefinito
+
+async def scan_devices(duration=10, scanner=None, latest=None):
     """
     Scansiona i dispositivi BLE nelle vicinanze.
     
     Args:
         duration (int): Durata della scansione in secondi
+        scanner (BleakScanner, optional): Scanner già avviato da cui raccogliere i
+                                          dispositivi invece di una nuova scansione
+        latest (dict, optional): Il dizionario aggiornato dalla callback dello scanner
+                                 (vedi make_rssi_callback), letto per primo per il RSSI
         
     Returns:
         Lista dei dispositivi scoperti
     """
     print(f"Scanning for Bluetooth devices for {duration} seconds...")  # Messaggio di inizio scansione
-    devices = await BleakScanner.discover(timeout=duration)  # Avvia la scansione per il tempo specificato
+    if scanner is None:
+        devices = await BleakScanner.discover(timeout=duration)  # Avvia la scansione per il tempo specificato
+    else:
+        # Lascia che lo scanner già attivo raccolga gli advertisement per la durata della scansione
+        await asyncio.sleep(duration)
+        devices = scanner.discovered_devices
     
     if not devices:
         print("No devices found.")  # Nessun dispositivo trovato
@@ -168,121 +325,81 @@ async def scan_devices(duration=10):
     
     print("\nDevices found:")  # Intestazione per i dispositivi trovati
     for i, device in enumerate(devices):
-        # Accede al RSSI - prova diversi approcci per assicurarsi di ottenere un valore
-        rssi = 'Unknown'  # Valore predefinito
-        
-        # Prima prova l'approccio consigliato con advertisement_data
-        if hasattr(device, 'advertisement_data') and hasattr(device.advertisement_data, 'rssi'):
-            rssi = device.advertisement_data.rssi
+        # Legge una sola volta i dati di advertisement (None se questa versione di bleak non li fornisce)
+        adv_data = getattr(device, 'advertisement_data', None)
         
-        # Se non ha funzionato, prova la proprietà diretta (con soppressione degli avvisi)
-        if rssi == 'Unknown' and hasattr(device, 'rssi'):
-            rssi = device.rssi
-                
-        # Se ancora non abbiamo un valore, prova altre proprietà che potrebbero contenere RSSI
-        if rssi == 'Unknown' and hasattr(device, 'metadata') and 'rssi' in device.metadata:
-            rssi = device.metadata['rssi']
-        
-        # Ottiene un nome leggibile
-        name = "Unknown Device"  # Nome predefinito
-        
-        # Funzione per verificare se il nome è solo un indirizzo MAC formattato
-        def is_mac_address_name(name_str, address_str):
-            # Rimuove i due punti dall'indirizzo
-            clean_addr = address_str.replace(':', '')
-            # Rimuove trattini e altri separatori comuni dal nome
-            clean_name = name_str.replace('-', '').replace(':', '').replace('_', '')
-            # Controlla se il nome pulito è lo stesso dell'indirizzo pulito (case insensitive)
-            return clean_name.lower() == clean_addr.lower()
-        
-        # Prova a ottenere il nome dal dispositivo
-        if device.name:
-            # Prova a decodificare se è in bytes
-            if isinstance(device.name, bytes):
-                try:
-                    name = device.name.decode('utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        name = device.name.decode('ascii', errors='replace')
-                    except Exception:
-                        name = str(device.name)
-            else:
-                name = str(device.name)
-                
-            # Pulisce il nome
-            name = name.strip()
-            if not name:
-                name = "Unknown Device"
-                
-            # Controlla se il nome è solo un indirizzo MAC formattato
-            if is_mac_address_name(name, device.address):
-                name = "Unknown Device"
+        # Accede al RSSI - prova diversi approcci per assicurarsi di ottenere un valore
+        # Prima usa l'ultimo advertisement registrato dalla callback dello scanner condiviso
+        reading = latest.get(device.address.lower()) if latest is not None else None
+        rssi = reading[0] if reading else None
         
-        # Prova a ottenere un nome migliore dai dati di advertisement
-        if name == "Unknown Device" and hasattr(device, 'advertisement_data'):
-            adv_data = device.advertisement_data
-            
-            # Prova a ottenere il nome locale completo
-            if hasattr(adv_data, 'local_name') and adv_data.local_name:
-                name = adv_data.local_name
-            
-            # Prova i dati di servizio per suggerimenti sul tipo di dispositivo
-            if name == "Unknown Device" and hasattr(adv_data, 'service_data') and adv_data.service_data:
-                # Controlla gli UUID di servizio comuni per identificare i tipi di dispositivo
-                services = list(adv_data.service_data.keys())
-                if services:
-                    if any('1800' in s.lower() for s in services):  # Generic Access Profile
-                        name = "Generic BLE Device"
-                    elif any('180f' in s.lower() for s in services):  # Battery Service
-                        name = "Battery-powered Device"
-                    elif any('180a' in s.lower() for s in services):  # Device Information
-                        name = "BLE Device"
-                    elif any('1812' in s.lower() for s in services):  # HID Service
-                        name = "HID Device (Keyboard/Mouse)"
-                    elif any('1802' in s.lower() for s in services):  # Immediate Alert
-                        name = "Alert Device"
-                    elif any('1803' in s.lower() for s in services):  # Link Loss
-                        name = "Proximity Device"
+        # Poi prova l'approccio consigliato con advertisement_data
+        if rssi is None:
+            rssi = getattr(adv_data, 'rssi', None)
         
-        # Ottiene i dati del produttore se disponibili utilizzando l'approccio consigliato
-        manufacturer = ""
-        manufacturer_id = None
-        mfg_data = None
+        # Se non ha funzionato, prova la proprietà diretta
+        if rssi is None:
+            rssi = getattr(device, 'rssi', None)
         
-        # Prova a ottenere i dati del produttore da advertisement_data (modo consigliato)
-        if hasattr(device, 'advertisement_data') and hasattr(device.advertisement_data, 'manufacturer_data'):
-            mfg_data = device.advertisement_data.manufacturer_data
-            if mfg_data and len(mfg_data) > 0:
-                manufacturer_id = list(mfg_data.keys())[0]
-                manufacturer = f" (Manufacturer: {manufacturer_id})"
+        # Se ancora non abbiamo un valore, prova altre proprietà che potrebbero contenere RSSI
+        if rssi is None:
+            rssi = (getattr(device, 'metadata', None) or {}).get('rssi', 'Unknown')  # 'Unknown' come valore predefinito
         
-        # Prova a identificare produttori comuni e tipi di dispositivo specifici
-        if name == "Unknown Device":
-            if manufacturer_id is not None:
-                if manufacturer_id == 76:  # Apple
-                    # Identifica sempre come Apple, anche se non possiamo determinare il tipo specifico
-                    name = identify_apple_device(mfg_data)
-                    # Rimuove le informazioni duplicate del produttore poiché sono nel nome
-                    manufacturer = ""
-                elif manufacturer_id == 6:  # Microsoft
-                    name = "Microsoft Device"
-                elif manufacturer_id == 224:  # Google
-                    name = "Google Device"
-                elif manufacturer_id == 117:  # Samsung
-                    name = "Samsung Device"
-                else:
-                    # Per altri produttori, mostra almeno "Device (Manufacturer: X)"
-                    name = f"Device"
-            # Se ancora non abbiamo un nome e l'indirizzo segue i modelli Apple, fai una stima educata
-            elif name == "Unknown Device" and is_likely_apple_device(device.address):
-                name = "Likely Apple Device"
+        # Ottiene un nome leggibile e il suffisso del produttore
+        name, manufacturer = _resolve_name(device, adv_data)
         
         # Stampa le informazioni del dispositivo
         print(f"{i+1}. Address: {device.address} - Name: {name}{manufacturer} - RSSI: {rssi} dB")
     
     return devices  # Restituisce la lista dei dispositivi trovati
 
-async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0):
+def make_rssi_callback(latest):
+    """
+    Crea una callback di rilevamento per BleakScanner che registra l'RSSI dei dispositivi.
+    
+    Args:
+        latest (dict): Aggiornato con indirizzo in minuscolo -> (rssi, time.monotonic())
+                       ad ogni advertisement ricevuto
+        
+    Returns:
+        Funzione da passare come detection_callback a BleakScanner
+    """
+    def on_advertisement(found_device, advertisement_data):
+        # Chiamata da Bleak per ogni advertisement ricevuto: il dispositivo cercato
+        # si trova poi con una sola ricerca nel dizionario, senza scorrere gli altri
+        latest[found_device.address.lower()] = (advertisement_data.rssi, time.monotonic())
+    
+    return on_advertisement
+
+async def find_discovered_device(scanner, address, timeout=10.0):
+    """
+    Attende che un dispositivo venga visto da uno scanner già avviato.
+    
+    Args:
+        scanner (BleakScanner): Scanner in esecuzione
+        address (str): Indirizzo MAC o identificatore del dispositivo
+        timeout (float): Tempo massimo di attesa in secondi
+        
+    Returns:
+        Il dispositivo trovato, o None se non è stato visto entro il timeout
+    """
+    addr_lower = address.lower()  # Indirizzo normalizzato una sola volta per i confronti
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout  # Scadenza dell'attesa
+    
+    while True:
+        # Cerca il dispositivo tra quelli già scoperti dallo scanner
+        for found_device in scanner.discovered_devices:
+            if found_device.address.lower() == addr_lower:
+                return found_device
+        
+        if loop.time() >= deadline:
+            return None  # Dispositivo non visto entro il timeout
+        
+        await asyncio.sleep(0.5)  # Attende nuovi advertisement prima di riprovare
+
+async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0,
+                                  scanner=None, latest=None):
     """
     Monitora la potenza del segnale di un dispositivo BLE senza connettersi.
     
@@ -292,10 +409,28 @@ async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power
         duration (int, optional): Durata totale del monitoraggio in secondi
         tx_power (int): Valore di calibrazione per la stima della distanza
         n_factor (float): Esponente di perdita del percorso per la stima della distanza
+        scanner (BleakScanner, optional): Scanner già avviato da condividere, creato
+                                          con detection_callback=make_rssi_callback(latest)
+        latest (dict, optional): Il dizionario aggiornato dalla callback dello scanner,
+                                 obbligatorio quando viene passato scanner
+        
+    Raises:
+        ValueError: Se scanner viene passato senza latest
     """
+    # Senza il dizionario della callback lo scanner condiviso non fornirebbe alcuna lettura
+    if scanner is not None and latest is None:
+        raise ValueError("latest must be given together with scanner")
+    
+    addr_lower = address.lower()  # Indirizzo normalizzato una sola volta per i confronti
+    # Uno scanner condiviso viene avviato e fermato da chi lo ha creato
+    own_scanner = scanner is None
+    
     # Prima scansione per ottenere il dispositivo
     print(f"Looking for device with address: {address}")
-    device = await BleakScanner.find_device_by_address(address, timeout=10.0)
+    if own_scanner:
+        device = await BleakScanner.find_device_by_address(address, timeout=10.0)
+    else:
+        device = await find_discovered_device(scanner, address, timeout=10.0)  # Usa lo scanner già attivo
     
     if not device:
         print(f"Device with address {address} not found. Make sure it's powered on and in range.")
@@ -304,85 +439,71 @@ async def monitor_signal_strength(address, interval=1.0, duration=None, tx_power
     print(f"Found device: {device.address} - {device.name or 'Unknown'}")
     
     # Utilizziamo uno scanner per ottenere continuamente RSSI senza mantenere una connessione
-    # Questo funziona meglio per i dispositivi che non consentono connessioni o hanno servizi limitati
-    scanner = BleakScanner()
+    # Questo funziona meglio per i dispositivi che non consentono connessioni o hanno servizi limitati.
+    # Lo scanner resta attivo per tutta la sessione e la callback conserva l'ultimo
+    # advertisement di ogni dispositivo per indirizzo, così nessun advertisement viene perso
+    # tra una lettura e l'altra e il nostro dispositivo si trova con una sola ricerca
+    if own_scanner:
+        latest = {}  # Ultimo advertisement per indirizzo: (RSSI, istante di ricezione)
+        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
     
     print("\nMonitoring signal strength...")
     print("(Press Ctrl+C to stop)")
     
-    start_time = time.time()  # Tempo di inizio
+    # Orologio monotono del ciclo di eventi; senza una durata la scadenza non viene mai raggiunta
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration if duration else float('inf')  # Scadenza del monitoraggio
     count = 0  # Contatore delle letture
+    # La base della stima della distanza dipende solo dai valori di calibrazione,
+    # quindi viene calcolata una sola volta per tutta la sessione
+    distance_base = _distance_base(n_factor)
+    # Un advertisement più vecchio di un ciclo di monitoraggio (la precedente finestra
+    # di scansione di 1 secondo più l'intervallo) indica che il dispositivo non è più nel raggio
+    max_age = interval + 1.0
+    # Lega il metodo write una sola volta: ogni lettura viene emessa con una sola chiamata
+    stdout_write = sys.stdout.write
     
     try:
+        if own_scanner:
+            await scanner.start()  # Avvia la scansione una sola volta
+        
         while True:
             # Se è stata specificata una durata e l'abbiamo superata, esci dal ciclo
-            if duration and (time.time() - start_time) > duration:
+            if loop.time() > deadline:
                 break
                 
-            # Scansiona il dispositivo per ottenere RSSI aggiornato
-            await scanner.start()
-            await asyncio.sleep(1.0)  # Dà tempo per la scansione
-            
-            # Usa la proprietà invece del metodo deprecato
-            devices = scanner.discovered_devices
-            await scanner.stop()
+            # Attende il prossimo intervallo mentre lo scanner raccoglie gli advertisement
+            await asyncio.sleep(interval)
             
-            # Trova il nostro dispositivo nei risultati della scansione
-            target_device = next((d for d in devices if d.address.lower() == address.lower()), None)
+            # Trova l'ultimo advertisement del nostro dispositivo
+            reading = latest.get(addr_lower)
             
             count += 1
-            timestamp = datetime.now().strftime("%H:%M:%S")  # Timestamp corrente
+            timestamp = time.strftime("%H:%M:%S")  # Timestamp corrente
             
-            if target_device:
-                # Ottiene RSSI in modo sicuro dai dati di advertisement se disponibili
-                rssi = None
+            if reading and time.monotonic() - reading[1] <= max_age:
+                rssi = reading[0]
                 
-                # Prova diversi approcci per ottenere RSSI
-                rssi = None
+                # Stima la distanza in base a RSSI utilizzando i valori di calibrazione forniti
+                distance = _distance_from_base(distance_base, tx_power, rssi)
+                distance_desc = get_distance_description(distance)
                 
-                # Prova a ottenere RSSI dagli advertisement (approccio consigliato)
-                if hasattr(scanner, 'advertisements'):
-                    for adv in scanner.advertisements.values():
-                        if adv.device.address.lower() == address.lower():
-                            rssi = adv.rssi
-                            break
+                # Stampa la potenza del segnale con una semplice visualizzazione a barre (una sola print per lettura)
+                bars = int(rssi + 100) // 10
+                bar_str = _BARS[0 if bars < 0 else 10 if bars > 10 else bars]
                 
-                # Se non ha funzionato, prova la proprietà diretta (con soppressione degli avvisi)
-                if rssi is None and hasattr(target_device, 'rssi'):
-                    import warnings
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        rssi = target_device.rssi
-                        
-                # Se ancora non abbiamo un valore, prova altre proprietà che potrebbero contenere RSSI
-                if rssi is None and hasattr(target_device, 'metadata') and 'rssi' in target_device.metadata:
-                    rssi = target_device.metadata['rssi']
-                
-                if rssi is not None:
-                    # Stima la distanza in base a RSSI utilizzando i valori di calibrazione forniti
-                    distance = estimate_distance(rssi, tx_power, n_factor)
-                    distance_desc = get_distance_description(distance)
-                    
-                    # Stampa la potenza del segnale con una semplice visualizzazione a barre
-                    bars = min(10, max(0, int((rssi + 100) / 10)))
-                    bar_str = '█' * bars + '░' * (10 - bars)
-                    
-                    print(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]")
-                    print(f"                      Estimated Distance: {distance} meters ({distance_desc})")
-                else:
-                    print(f"[{timestamp}] Reading #{count}: Device found but could not get RSSI value.")
+                stdout_write(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]\n"
+                             f"                      Estimated Distance: {distance} meters ({distance_desc})\n")
             else:
                 print(f"[{timestamp}] Reading #{count}: Device not found in scan results. It may be out of range.")
             
-            # Attende il prossimo intervallo
-            await asyncio.sleep(interval)
-            
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        await scanner.stop()  # Assicura che lo scanner venga fermato
+        if own_scanner:
+            await scanner.stop()  # Assicura che lo scanner venga fermato
 
 async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59, n_factor=2.0):
     """
@@ -398,6 +519,7 @@ async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59
         n_factor (float): Esponente di perdita del percorso per la stima della distanza
     """
     print(f"\nAttempting to connect to device: {address}")
+    addr_lower = address.lower()  # Indirizzo normalizzato una sola volta per i confronti
     
     try:
         # Tenta di connettersi al dispositivo
@@ -405,68 +527,61 @@ async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59
             if client.is_connected:
                 print("Connected successfully!")
                 
-                start_time = time.time()
+                # Orologio monotono del ciclo di eventi; senza una durata la scadenza non viene mai raggiunta
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + duration if duration else float('inf')  # Scadenza del monitoraggio
                 count = 0
+                # Base della stima della distanza, calcolata una sola volta (vedi monitor_signal_strength)
+                distance_base = _distance_base(n_factor)
+                
+                # La disponibilità di RSSI diretto non cambia durante la connessione: la controlla una sola volta
+                has_direct_rssi = hasattr(client, 'rssi')
+                scanner = None
+                latest = {}
+                # Un advertisement più vecchio di un ciclo (la precedente finestra di 0.5 secondi più l'intervallo) non è più valido
+                max_age = interval + 0.5
+                # Lega il metodo write una sola volta: ogni lettura viene emessa con una sola chiamata
+                stdout_write = sys.stdout.write
                 
                 try:
+                    if not has_direct_rssi:
+                        # Torna allo scanner se RSSI diretto non è disponibile:
+                        # un solo scanner resta attivo per tutta la sessione
+                        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
+                        await scanner.start()
+                        await asyncio.sleep(0.5)  # Dà tempo per ricevere il primo advertisement
+                    
                     while True:
                         # Se è stata specificata una durata e l'abbiamo superata, esci dal ciclo
-                        if duration and (time.time() - start_time) > duration:
+                        if loop.time() > deadline:
                             break
                             
                         # Ottiene l'ora corrente per il timestamp
-                        timestamp = datetime.now().strftime("%H:%M:%S")
+                        timestamp = time.strftime("%H:%M:%S")
                         
                         # Per i dispositivi connessi, possiamo ottenere direttamente RSSI
                         rssi = None
-                        if hasattr(client, 'rssi'):
+                        if has_direct_rssi:
                             rssi = await client.get_rssi()
                         else:
-                            # Torna allo scanner se RSSI diretto non è disponibile
-                            scanner = BleakScanner()
-                            await scanner.start()
-                            await asyncio.sleep(0.5)
-                            
-                            # Usa la proprietà invece del metodo deprecato
-                            devices = scanner.discovered_devices
-                            await scanner.stop()
-                            
-                            # Prova diversi approcci per ottenere RSSI
-                            rssi = None
-                            
-                            # Prova a ottenere RSSI dagli advertisement (approccio consigliato)
-                            if hasattr(scanner, 'advertisements'):
-                                for adv in scanner.advertisements.values():
-                                    if adv.device.address.lower() == address.lower():
-                                        rssi = adv.rssi
-                                        break
-                            
-                            # Se non ha funzionato, prova la proprietà diretta (con soppressione degli avvisi)
-                            if rssi is None:
-                                device = next((d for d in devices if d.address.lower() == address.lower()), None)
-                                if device and hasattr(device, 'rssi'):
-                                    import warnings
-                                    with warnings.catch_warnings():
-                                        warnings.simplefilter("ignore")
-                                        rssi = device.rssi
-                                        
-                            # Se ancora non abbiamo un valore, prova altre proprietà che potrebbero contenere RSSI
-                            if rssi is None and device and hasattr(device, 'metadata') and 'rssi' in device.metadata:
-                                rssi = device.metadata['rssi']
+                            # Altrimenti usa l'ultimo advertisement ricevuto dallo scanner di ripiego
+                            reading = latest.get(addr_lower)
+                            if reading and time.monotonic() - reading[1] <= max_age:
+                                rssi = reading[0]
                         
                         count += 1
                         
                         if rssi is not None:
                             # Stima la distanza in base a RSSI utilizzando i valori di calibrazione forniti
-                            distance = estimate_distance(rssi, tx_power, n_factor)
+                            distance = _distance_from_base(distance_base, tx_power, rssi)
                             distance_desc = get_distance_description(distance)
                             
-                            # Stampa la potenza del segnale con una semplice visualizzazione a barre
-                            bars = min(10, max(0, int((rssi + 100) / 10)))
-                            bar_str = '█' * bars + '░' * (10 - bars)
+                            # Stampa la potenza del segnale con una semplice visualizzazione a barre (una sola print per lettura)
+                            bars = int(rssi + 100) // 10
+                            bar_str = _BARS[0 if bars < 0 else 10 if bars > 10 else bars]
                             
-                            print(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]")
-                            print(f"                      Estimated Distance: {distance} meters ({distance_desc})")
+                            stdout_write(f"[{timestamp}] Reading #{count}: Signal Strength: {rssi} dB [{bar_str}]\n"
+                                         f"                      Estimated Distance: {distance} meters ({distance_desc})\n")
                         else:
                             print(f"[{timestamp}] Reading #{count}: Could not get signal strength.")
                         
@@ -474,6 +589,9 @@ async def connect_and_monitor(address, interval=1.0, duration=None, tx_power=-59
                         
                 except KeyboardInterrupt:
                     print("\nMonitoring stopped by user")
+                finally:
+                    if scanner is not None:
+                        await scanner.stop()  # Assicura che lo scanner venga fermato
             else:
                 print("Failed to connect. Device may not be connectable or may be out of range.")
                 # Torna al monitoraggio senza connessione
@@ -503,34 +621,47 @@ async def main_async():
     
     args = parser.parse_args()  # Analizza gli argomenti
     
-    # Se è richiesta una scansione o non è fornito un indirizzo, esegue una scansione
-    if args.scan or not args.address:
-        devices = await scan_devices(args.time)
-        if not args.address and devices:
-            # Se non è fornito un indirizzo ma sono stati trovati dispositivi, chiede all'utente di selezionarne uno
-            try:
-                choice = int(input("\nEnter the number of the device to monitor (0 to exit): "))
-                if choice > 0 and choice <= len(devices):
-                    args.address = devices[choice-1].address
-                else:
-                    print("Exiting...")
+    # Senza --connect un unico scanner serve sia la scansione dei dispositivi sia la
+    # sessione di monitoraggio, così l'adattatore viene avviato e fermato una sola volta
+    scanner = None
+    latest = {}  # Ultimo advertisement per indirizzo: (RSSI, istante di ricezione)
+    if not args.connect:
+        scanner = BleakScanner(detection_callback=make_rssi_callback(latest))
+        await scanner.start()
+    
+    try:
+        # Se è richiesta una scansione o non è fornito un indirizzo, esegue una scansione
+        if args.scan or not args.address:
+            devices = await scan_devices(args.time, scanner, latest)
+            if not args.address and devices:
+                # Se non è fornito un indirizzo ma sono stati trovati dispositivi, chiede all'utente di selezionarne uno
+                try:
+                    choice = int(input("\nEnter the number of the device to monitor (0 to exit): "))
+                    if choice > 0 and choice <= len(devices):
+                        args.address = devices[choice-1].address
+                    else:
+                        print("Exiting...")
+                        return
+                except (ValueError, IndexError):
+                    print("Invalid selection. Exiting...")
                     return
-            except (ValueError, IndexError):
-                print("Invalid selection. Exiting...")
-                return
-    
-    # Se è disponibile un indirizzo, avvia il monitoraggio
-    if args.address:
-        # Ottiene i valori di calibrazione
-        tx_power = args.power
-        n_factor = args.factor
         
-        if args.connect:
-            # Tenta di connettersi e monitorare
-            await connect_and_monitor(args.address, args.interval, args.duration, tx_power, n_factor)
-        else:
-            # Monitora senza connessione
-            await monitor_signal_strength(args.address, args.interval, args.duration, tx_power, n_factor)
+        # Se è disponibile un indirizzo, avvia il monitoraggio
+        if args.address:
+            # Ottiene i valori di calibrazione
+            tx_power = args.power
+            n_factor = args.factor
+            
+            if args.connect:
+                # Tenta di connettersi e monitorare
+                await connect_and_monitor(args.address, args.interval, args.duration, tx_power, n_factor)
+            else:
+                # Monitora senza connessione
+                await monitor_signal_strength(args.address, args.interval, args.duration, tx_power, n_factor,
+                                              scanner, latest)
+    finally:
+        if scanner is not None:
+            await scanner.stop()  # Ferma lo scanner condiviso anche in caso di uscita anticipata
 
 def main():
     """